@@ -8,6 +8,11 @@ South America, Oceania, Antarctica), and writes out a new CSV.
 
 This script attempts to use the 'Code' (ISO alpha-3) column in the forest CSV
 to match countries to continents using an authoritative mapping CSV downloaded at runtime.
+The downloaded mapping (and the lookups built from it) are cached under ~/.cache/addRegion
+(or $XDG_CACHE_HOME) for a day.
+
+The input may also be a Parquet file (path ending in ".parquet").
+The output is written by write_csv (see its docstring for the CSV format).
 
 Usage:
     python add_region_to_forest_csv.py \
@@ -20,11 +25,21 @@ If no paths are provided, it will default to:
 """
 
 import argparse
+import functools
+import hashlib
 import io
+import os
+import pickle
+import re
 import sys
-import csv
+import threading
+import time
 import urllib.request
+from pathlib import Path
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 
 # -----------------------------------------------------------------------------
 # Configuration: mapping CSV URL (authoritative country -> continent list).
@@ -45,6 +60,11 @@ FALLBACK_MAPPING_CSV_URL = (
     "https://raw.githubusercontent.com/lukes/ISO-3166-Countries-with-Regional-Codes/master/all/all.csv"
 )
 
+# Downloaded mapping files are cached on disk (one file per URL) so repeated runs
+# don't pay for the network round-trip. The mapping changes rarely; refresh daily.
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "addRegion"
+CACHE_MAX_AGE_SECONDS = 24 * 60 * 60
+
 # -----------------------------------------------------------------------------
 # Helper functions
 # -----------------------------------------------------------------------------
@@ -58,28 +78,75 @@ def download_text(url, timeout=20):
     except Exception as e:
         raise RuntimeError(f"Failed to download {url}: {e}")
 
+def _cache_path(url, suffix=""):
+    """Path of the on-disk cache entry for url (keyed by URL hash, so a new URL never reuses old data)."""
+    return CACHE_DIR / (hashlib.sha1(url.encode("utf-8")).hexdigest() + suffix)
+
+def _read_cache(path, max_age=CACHE_MAX_AGE_SECONDS):
+    """Return the bytes cached at path if it is younger than max_age seconds, else None."""
+    try:
+        if time.time() - path.stat().st_mtime < max_age:
+            return path.read_bytes()
+    except OSError:
+        pass  # not cached yet (or unreadable)
+    return None
+
+def _write_cache(path, data):
+    """Store data (bytes) at path; failures only print a warning."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # write to a temp file and rename so a partial write is never picked up
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Warning: could not write cache file {path}: {e}", file=sys.stderr)
+
+def download_text_cached(url, max_age=CACHE_MAX_AGE_SECONDS, timeout=20):
+    """Like download_text, but reuse a copy cached on disk if it is younger than max_age seconds."""
+    path = _cache_path(url)
+    cached = _read_cache(path, max_age)
+    if cached is not None:
+        return cached.decode("utf-8")
+    text = download_text(url, timeout=timeout)
+    _write_cache(path, text.encode("utf-8"))
+    return text
+
+@functools.lru_cache(maxsize=None)
+def read_mapping_csv(mapping_csv_text):
+    """
+    Parse the mapping CSV text once into a DataFrame of strings.
+    Both the ISO3 -> continent and the country name -> continent lookups are built
+    from this frame, so the text is tokenized a single time (by pandas' C parser).
+    """
+    mapping_csv_text = mapping_csv_text.strip()
+    # The raw mapping files are comma-separated (the gist only *displays* with spaces).
+    # Rather than running csv.Sniffer on every run, pick whichever common delimiter
+    # occurs most in the header line; ties (e.g. a single-column file) go to comma.
+    header_line = mapping_csv_text.split("\n", 1)[0]
+    delimiter = max(",;\t|", key=header_line.count)
+    # keep_default_na=False: "NA" is a real continent code (North America) and country code (Namibia)
+    return pd.read_csv(
+        io.StringIO(mapping_csv_text),
+        sep=delimiter,
+        dtype=str,
+        keep_default_na=False,
+        on_bad_lines="skip",
+    ).fillna("")
+
+@functools.lru_cache(maxsize=None)
 def build_iso3_to_continent_map(mapping_csv_text):
     """
     Parse the mapping CSV text and return a dict: ISO3 -> Continent (simple names).
     The mapping CSV we're using has headers like:
       Continent_Name Continent_Code Country_Name Two_Letter_Country_Code Three_Letter_Country_Code Country_Number
-    Some files may be comma-separated or space-separated; we'll robustly parse with csv.reader.
+    Files may be comma-, semicolon-, tab- or pipe-separated; the delimiter is detected in read_mapping_csv.
     """
-    # Normalize newlines and attempt to parse
-    lines = mapping_csv_text.strip().splitlines()
-    # Some gist files use spaces as separators in the view; however the raw CSV is comma-separated.
-    # We'll try csv.Sniffer to detect delimiter.
-    sample = "\n".join(lines[:10])
-    try:
-        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t| ")
-        reader = csv.reader(lines, dialect)
-    except Exception:
-        # fallback: split on comma
-        reader = csv.reader(lines)
+    mapping = read_mapping_csv(mapping_csv_text)
+    header = list(mapping.columns)
 
     iso3_index = None
     continent_index = None
-    header = next(reader)
     # find likely column names (case-insensitive)
     for i, h in enumerate(header):
         hh = h.strip().lower()
@@ -99,193 +166,175 @@ def build_iso3_to_continent_map(mapping_csv_text):
                 continent_index = i
 
     # If still None, attempt to detect by position (common formats: continent,name,alpha2,alpha3)
-    if iso3_index is None or continent_index is None:
-        # try to detect a header that contains an ISO3-like entry in the second line
+    if (iso3_index is None or continent_index is None) and len(mapping):
         # We'll look at first data row and check fields for 3-letter codes and continent names
-        # rewind
-        reader = csv.reader(lines)
-        header = next(reader)
-        first_data = next(reader, None)
-        if first_data:
-            # find candidate iso3 columns that look like 3 uppercase letters
-            for i, v in enumerate(first_data):
-                if iso3_index is None and isinstance(v, str) and len(v.strip()) == 3 and v.strip().isalpha():
-                    iso3_index = i
-                if continent_index is None and isinstance(v, str) and v.strip().lower() in (
-                    "asia","europe","africa","north america","south america","oceania","antarctica",
-                    "asia ","europe ","africa ","north america ","south america ","oceania ","antarctica "
-                ):
-                    continent_index = i
+        first_data = mapping.iloc[0].tolist()
+        # find candidate iso3 columns that look like 3 uppercase letters
+        for i, v in enumerate(first_data):
+            if iso3_index is None and len(v.strip()) == 3 and v.strip().isalpha():
+                iso3_index = i
+            if continent_index is None and v.strip().lower() in (
+                "asia","europe","africa","north america","south america","oceania","antarctica",
+            ):
+                continent_index = i
 
     if iso3_index is None or continent_index is None:
         raise RuntimeError("Could not determine ISO3 or Continent columns from mapping CSV header: " + ", ".join(header))
 
     # Build map
-    iso3_to_cont = {}
-    # Recreate reader to iterate from start (skip header again)
-    reader = csv.reader(lines)
-    next(reader)  # skip header
-    for row in reader:
-        if len(row) <= max(iso3_index, continent_index):
-            continue
-        iso3 = row[iso3_index].strip()
-        cont = row[continent_index].strip()
-        if not iso3:
-            continue
-        # Normalize continent names to our simple categories:
-        cont_norm = cont
-        # handle variants
-        cont_norm = cont_norm.replace("Americas", "North America")  # safe default
-        # Standard names in source are already like: Asia, Europe, Africa, North America, South America, Oceania, Antarctica
-        # Ensure consistent capitalization and trim
-        cont_norm = cont_norm.strip()
-        # Map short codes (if Continent column contains codes like 'AS', 'EU', etc.)
-        if len(cont_norm) == 2 and cont_norm.upper() in ("AS","EU","AF","NA","SA","OC","AN"):
-            code_map = {
-                "AS": "Asia",
-                "EU": "Europe",
-                "AF": "Africa",
-                "NA": "North America",
-                "SA": "South America",
-                "OC": "Oceania",
-                "AN": "Antarctica",
-            }
-            cont_norm = code_map.get(cont_norm.upper(), cont_norm)
-        # Some rows may list duplicated mapping lines (e.g. a territory twice) — it's fine
-        iso3_to_cont[iso3.upper()] = cont_norm
-    return iso3_to_cont
+    iso3 = mapping.iloc[:, iso3_index].str.strip().str.upper()
+    # Normalize continent names to our simple categories:
+    # handle variants ("Americas" -> North America is a safe default) and trim.
+    # Standard names in source are already like: Asia, Europe, Africa, North America, South America, Oceania, Antarctica
+    cont = mapping.iloc[:, continent_index].str.replace("Americas", "North America", regex=False).str.strip()
+    # Map short codes (if Continent column contains codes like 'AS', 'EU', etc.)
+    code_map = {
+        "AS": "Asia",
+        "EU": "Europe",
+        "AF": "Africa",
+        "NA": "North America",
+        "SA": "South America",
+        "OC": "Oceania",
+        "AN": "Antarctica",
+    }
+    cont = cont.mask(cont.str.len() == 2, cont.str.upper().map(code_map)).fillna(cont)
+    # Some rows may list duplicated mapping lines (e.g. a territory twice) — the last one wins
+    has_code = iso3 != ""
+    return dict(zip(iso3[has_code], cont[has_code]))
 
-def main(input_path, output_path, mapping_url=MAPPING_CSV_URL):
-    # Read input CSV
-    print(f"Reading input CSV: {input_path}")
-    try:
-        df = pd.read_csv(input_path)
-    except Exception as e:
-        print(f"Failed to read input CSV '{input_path}': {e}", file=sys.stderr)
-        sys.exit(1)
+@functools.lru_cache(maxsize=None)
+def build_name_to_continent_map(mapping_csv_text):
+    """
+    Parse the mapping CSV text and return a dict: lowercased country name -> Continent.
+    Returns an empty dict if the mapping has no country name or continent column.
+    """
+    mapping = read_mapping_csv(mapping_csv_text)
+    # detect the country name and continent columns (position may differ between sources)
+    cname_col = next((h for h in mapping.columns if "country" in h.lower() and "name" in h.lower()), None)
+    cont_col = next((h for h in mapping.columns if "continent" in h.lower()), None)
+    if cname_col is None or cont_col is None:
+        return {}
+    # sometimes comma within name; keep full string
+    names = mapping[cname_col].str.strip().str.lower()
+    has_name = names != ""
+    return dict(zip(names[has_name], mapping.loc[has_name, cont_col].str.strip()))
 
+def detect_code_column(df):
+    """Return the name of the ISO alpha-3 code column in df, or None if none is found."""
     # We expect an ISO alpha-3 code column named 'Code' in the forest CSV.
     # If that doesn't exist, attempt to find a sensible column (e.g., "Code", "ISO3", "ISO_A3").
-    code_col = None
     for candidate in ("Code", "ISO3", "ISO_A3", "ISO", "code"):
         if candidate in df.columns:
-            code_col = candidate
-            break
-    if code_col is None:
-        # try to find a column of 3-letter uppercase strings
-        for c in df.columns:
-            sample_vals = df[c].dropna().astype(str).head(10).tolist()
-            if all(len(s.strip()) == 3 and s.strip().isalpha() for s in sample_vals if s.strip()):
-                code_col = c
-                break
+            return candidate
+    # try to find a column of 3-letter uppercase strings, peeking only at the first 10 rows
+    # (one small slice instead of a dropna/astype copy of every full column)
+    head = df.head(10)
+    for c in head.columns:
+        sample_vals = head[c].dropna().astype(str).str.strip()
+        sample_vals = sample_vals[sample_vals != ""]
+        if len(sample_vals) and sample_vals.str.fullmatch(r"[A-Za-z]{3}").all():
+            return c
+    return None
 
-    if code_col is None:
-        print("Could not detect an ISO alpha-3 code column in the input CSV. Please ensure there is a 3-letter 'Code' column (ISO3).", file=sys.stderr)
-        sys.exit(1)
-
-    print(f"Using ISO3 code column: '{code_col}'")
-
-    # Download mapping CSV
+def load_mapping_text(mapping_url=MAPPING_CSV_URL):
+    """
+    Download (or read from cache) the mapping CSV, trying the fallback URL if needed.
+    Returns (url, text), where url is the one the text actually came from. Exits on failure.
+    """
     print("Downloading country->continent mapping CSV...")
-    mapping_text = None
     try:
-        mapping_text = download_text(mapping_url)
+        return mapping_url, download_text_cached(mapping_url)
     except Exception as e:
         print(f"Primary mapping download failed: {e}", file=sys.stderr)
         print("Attempting fallback mapping URL...")
         try:
-            mapping_text = download_text(FALLBACK_MAPPING_CSV_URL)
+            return FALLBACK_MAPPING_CSV_URL, download_text_cached(FALLBACK_MAPPING_CSV_URL)
         except Exception as e2:
             print(f"Fallback mapping download also failed: {e2}", file=sys.stderr)
             sys.exit(1)
 
-    # Build ISO3 -> Continent map
+# Bump whenever build_iso3_to_continent_map / build_name_to_continent_map change what they
+# return, so region maps pickled by an older version of this script are not reused.
+REGION_MAPS_CACHE_VERSION = 1
+
+def _region_maps_cache_path(url):
+    """Path of the pickled (iso3_to_cont, name_to_cont) built from the mapping at url."""
+    return _cache_path(url, f".maps.v{REGION_MAPS_CACHE_VERSION}.pkl")
+
+def load_region_maps(mapping_url=MAPPING_CSV_URL):
+    """
+    Return (iso3_to_cont, name_to_cont) for the mapping at mapping_url. Exits on failure.
+    The built dicts are pickled next to the cached mapping CSV, so re-runs within
+    CACHE_MAX_AGE_SECONDS skip the download and the CSV parse altogether.
+    """
+    cached = _read_cache(_region_maps_cache_path(mapping_url))
+    if cached is not None:
+        try:
+            return pickle.loads(cached)
+        except Exception:
+            pass  # corrupt or unreadable -> rebuild
+
+    source_url, mapping_text = load_mapping_text(mapping_url)
+    # Build ISO3 -> Continent and country name -> Continent maps
     try:
-        iso3_to_cont = build_iso3_to_continent_map(mapping_text)
+        maps = (build_iso3_to_continent_map(mapping_text), build_name_to_continent_map(mapping_text))
     except Exception as e:
         print(f"Failed to parse mapping CSV: {e}", file=sys.stderr)
         sys.exit(1)
+    # Key the pickle on the URL the text actually came from: maps built from the fallback
+    # must not be served for the primary URL once it is reachable again.
+    _write_cache(_region_maps_cache_path(source_url), pickle.dumps(maps))
+    return maps
 
-    # Map codes to simple continent names
-    def lookup_continent(code, country_name=None):
-        if pd.isna(code):
-            return ""
-        c = str(code).strip().upper()
-        if not c:
-            return ""
-        continent = iso3_to_cont.get(c)
-        if continent:
-            # Normalize to our expected simple categories
-            cont_map = {
-                "Asia": "Asia",
-                "Europe": "Europe",
-                "Africa": "Africa",
-                "North America": "North America",
-                "South America": "South America",
-                "Oceania": "Oceania",
-                "Antarctica": "Antarctica",
-                # Some mapping sources may use "Americas" or similar — treat as North America by default
-                "Americas": "North America",
-            }
-            # If mapping value looks like 'AS' etc, already normalized in build function
-            return cont_map.get(continent, continent)
-        # If no mapping found, return empty string (or optionally try to guess from country_name)
-        return ""
-
-    # Apply lookup to the dataframe
-    df["Region"] = df[code_col].apply(lambda x: lookup_continent(x, None))
+def add_region_column(df, code_col, iso3_to_cont, name_to_cont):
+    """Add a 'Region' column to df (in place) from its ISO3 codes, falling back to Entity names."""
+    # Map codes to simple continent names in one vectorized pass over the column.
+    # Continent names (including "Americas" and 2-letter codes) are already
+    # normalized by build_iso3_to_continent_map; unmatched or missing codes get "".
+    # The column is cast once to Arrow-backed strings, so missing values are a validity
+    # bitmap rather than NaN objects and strip/upper run as Arrow compute kernels.
+    codes = df[code_col].astype("string[pyarrow]").str.strip().str.upper()
+    df["Region"] = codes.map(iso3_to_cont).fillna("")
 
     # Check for rows where Region is empty and print some examples
-    missing_mask = df["Region"].astype(str).str.strip() == ""
+    # (Region values are already stripped strings, so a plain comparison is enough)
+    missing_mask = df["Region"].eq("")
     if missing_mask.any():
         missing_codes = df.loc[missing_mask, code_col].astype(str).unique()
         print(f"Warning: {len(missing_codes)} unique ISO3 code(s) not found in mapping. Examples: {list(missing_codes)[:10]}")
         # Optionally, try to fill by matching country/entity name if the input has an 'Entity' or 'Country' column
         if "Entity" in df.columns:
             print("Attempting to fill missing regions by Entity name (best-effort)...")
-            # Build a reverse mapping from normalized country name to continent using the mapping CSV rows
-            # For robustness, build a name->continent map from the mapping CSV text
-            name_to_cont = {}
-            # naive parse: split mapping CSV lines and try to use the Country_Name column (position may differ)
-            lines = mapping_text.strip().splitlines()
-            reader = csv.reader(lines)
-            header = next(reader)
-            # detect country_name column index
-            cname_index = None
-            for i,h in enumerate(header):
-                if "country" in h.lower() and "name" in h.lower():
-                    cname_index = i
-                    break
-            # find continent index again
-            cont_index = None
-            for i,h in enumerate(header):
-                if "continent" in h.lower():
-                    cont_index = i
-                    break
-            if cname_index is not None and cont_index is not None:
-                for row in reader:
-                    if len(row) > max(cname_index, cont_index):
-                        nm = row[cname_index].strip().lower()
-                        cont = row[cont_index].strip()
-                        if nm:
-                            # sometimes comma within name; keep full string
-                            name_to_cont[nm] = cont
-            # try to match by lowercased Entity
-            def try_by_name(entity):
-                if pd.isna(entity): return ""
-                key = str(entity).strip().lower()
-                # exact match
-                if key in name_to_cont:
-                    return name_to_cont[key]
-                # try some relaxed matching: startswith, contains
-                for k in name_to_cont:
-                    if key == k: return name_to_cont[k]
-                    if key.startswith(k) or k.startswith(key): return name_to_cont[k]
-                    if k in key or key in k: return name_to_cont[k]
-                return ""
-            # fill
-            df.loc[missing_mask, "Region"] = df.loc[missing_mask, "Entity"].apply(try_by_name)
-            still_missing = df["Region"].astype(str).str.strip() == ""
+            # try to match by lowercased Entity: exact match first, as one hash lookup per row
+            entities = df.loc[missing_mask, "Entity"].astype("string[pyarrow]").str.strip().str.lower()
+            by_name = entities.map(name_to_cont)
+            unmatched = by_name.isna() & entities.fillna("").ne("")
+            if unmatched.any() and name_to_cont:
+                # relaxed matching: the longest mapping name found anywhere inside the entity,
+                # using one precompiled alternation instead of scanning every name per row.
+                # The lookahead makes findall report the longest match at *every* position
+                # (a plain extract would return the leftmost match, not the longest).
+                names_re = "(?=(" + "|".join(map(re.escape, sorted(name_to_cont, key=len, reverse=True))) + "))"
+                found = entities[unmatched].str.findall(names_re).map(
+                    lambda matches: max(matches, key=len) if isinstance(matches, list) and matches else None
+                )
+                by_name[unmatched] = found.map(name_to_cont)
+                unmatched &= by_name.isna()
+            if unmatched.any() and name_to_cont:
+                # ...or the entity inside a mapping name (e.g. "Iran" in "Iran, Islamic Republic of").
+                # Checked per unique unmatched entity (a handful), each as one vectorized
+                # substring test over the names; the first name in mapping order wins.
+                names = pd.Series(list(name_to_cont))
+                entity_to_cont = {}
+                for entity in entities[unmatched].unique():
+                    hits = names[names.str.contains(entity, regex=False)]
+                    if len(hits):
+                        entity_to_cont[entity] = name_to_cont[hits.iloc[0]]
+                by_name[unmatched] = entities[unmatched].map(entity_to_cont)
+            # fill, and only re-check the rows that were missing
+            by_name = by_name.fillna("")
+            df.loc[missing_mask, "Region"] = by_name
+            still_missing = by_name.eq("")
             if still_missing.any():
                 print(f"After best-effort name matching, {still_missing.sum()} rows still have no Region.")
             else:
@@ -293,10 +342,83 @@ def main(input_path, output_path, mapping_url=MAPPING_CSV_URL):
         else:
             print("No 'Entity' column available for fallback matching by name.")
 
+def write_csv(df, output_path):
+    """
+    Write df (without its index) as CSV using Arrow's multi-threaded C++ CSV writer.
+    This is the one writer for addRegion.py's and pipeline.py's outputs, so they share
+    one format: the header and every text field are quoted (an empty Region is ""),
+    missing values are empty, and integral floats are written without ".0".
+    """
+    # Object columns can mix Python types (pd.read_csv returns these for large inputs,
+    # with a DtypeWarning), which from_pandas rejects; write them as text instead.
+    object_cols = [c for c in df.columns if df[c].dtype == object]
+    if object_cols:
+        df = df.astype({c: "string" for c in object_cols})
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pacsv.write_csv(table, output_path, write_options=pacsv.WriteOptions(batch_size=1 << 16))
+
+def read_input(input_path, nrows=None):
+    """Read the input CSV (or a Parquet intermediate, e.g. written by removeYearsB41990.py), optionally only its first nrows rows."""
+    if str(input_path).endswith(".parquet"):
+        if nrows is None:
+            return pd.read_parquet(input_path)
+        parquet_file = pq.ParquetFile(input_path)
+        first_batch = next(parquet_file.iter_batches(batch_size=nrows), None)
+        if first_batch is None:
+            return parquet_file.schema_arrow.empty_table().to_pandas()
+        return first_batch.to_pandas()
+    return pd.read_csv(input_path, nrows=nrows)
+
+def read_input_and_maps(input_path, mapping_url=MAPPING_CSV_URL):
+    """
+    Read the input and load the region lookups, returning (df, code_col, iso3_to_cont, name_to_cont).
+    The code column is detected from a 10-row peek first, so an input without one fails before
+    any network access. Exits on failure.
+    """
+    print(f"Reading input CSV: {input_path}")
+    try:
+        # detect_code_column only looks at column names and the first 10 rows
+        code_col = detect_code_column(read_input(input_path, nrows=10))
+    except Exception as e:
+        print(f"Failed to read input CSV '{input_path}': {e}", file=sys.stderr)
+        sys.exit(1)
+    if code_col is None:
+        print("Could not detect an ISO alpha-3 code column in the input CSV. Please ensure there is a 3-letter 'Code' column (ISO3).", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Using ISO3 code column: '{code_col}'")
+
+    # The mapping download (network-bound) and the full input read (disk/parser-bound) are
+    # independent, so run them side by side; both release the GIL while they wait/parse.
+    # The maps load in a daemon thread: if the input read fails we exit straight away
+    # instead of waiting for the download (executor threads are joined at interpreter exit).
+    maps_result = {}
+    def load_maps():
+        try:
+            maps_result["maps"] = load_region_maps(mapping_url)
+        except BaseException as e:  # includes the SystemExit load_region_maps raises on failure
+            maps_result["error"] = e
+    maps_thread = threading.Thread(target=load_maps, daemon=True)
+    maps_thread.start()
+    try:
+        df = read_input(input_path)
+    except Exception as e:
+        print(f"Failed to read input CSV '{input_path}': {e}", file=sys.stderr)
+        sys.exit(1)
+    maps_thread.join()
+    if "error" in maps_result:
+        raise maps_result["error"]
+    iso3_to_cont, name_to_cont = maps_result["maps"]
+    return df, code_col, iso3_to_cont, name_to_cont
+
+def main(input_path, output_path, mapping_url=MAPPING_CSV_URL):
+    df, code_col, iso3_to_cont, name_to_cont = read_input_and_maps(input_path, mapping_url)
+    add_region_column(df, code_col, iso3_to_cont, name_to_cont)
+
     # Final write
     print(f"Writing output CSV to: {output_path}")
     try:
-        df.to_csv(output_path, index=False)
+        write_csv(df, output_path)
     except Exception as e:
         print(f"Failed to write output CSV: {e}", file=sys.stderr)
         sys.exit(1)
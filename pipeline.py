@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+pipeline.py
+
+Builds forest_area_with_region.csv from the raw forest-area CSV in one pass:
+reads the input once, keeps rows with Year >= 1990 (as removeYearsB41990.py does),
+adds the 'Region' column (as addRegion.py does) and writes only the final CSV,
+instead of writing and re-reading forest_area_from_1990.csv in between.
+Optionally also writes one CSV per requested year (as split_deforestation_by_year.py does),
+named after the output file, e.g. forest_area_with_region1990.csv.
+All outputs are written by addRegion.write_csv (see its docstring for the CSV format).
+
+Usage:
+    python pipeline.py \
+        --input /path/to/forest-area-as-share-of-land-area.csv \
+        --output /path/to/forest_area_with_region.csv \
+        --split-years 1990 2000 2010 2015
+"""
+
+import argparse
+import sys
+from pathlib import Path
+import pandas as pd
+
+from addRegion import MAPPING_CSV_URL, add_region_column, read_input_and_maps, write_csv
+
+def main(input_path, output_path, mapping_url=MAPPING_CSV_URL, split_years=()):
+    # Read input CSV (the only full read of the data in the whole pipeline), loading the
+    # region lookups at the same time since the two are independent
+    df, code_col, iso3_to_cont, name_to_cont = read_input_and_maps(input_path, mapping_url)
+
+    if "Year" not in df.columns:
+        print("No 'Year' column found in CSV header.", file=sys.stderr)
+        sys.exit(1)
+
+    # Keep only rows where Year >= 1990 (non-numeric years are dropped)
+    years = pd.to_numeric(df["Year"], errors="coerce")
+    df = df[years >= 1990].copy()
+
+    add_region_column(df, code_col, iso3_to_cont, name_to_cont)
+
+    # Final writes
+    print(f"Writing output CSV to: {output_path}")
+    try:
+        write_csv(df, output_path)
+    except Exception as e:
+        print(f"Failed to write output CSV: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if split_years:
+        output = Path(output_path)
+        year_col = pd.to_numeric(df["Year"], errors="coerce")
+        groups = dict(tuple(df.groupby(year_col, sort=False)))
+        for year in split_years:
+            year_path = output.with_name(f"{output.stem}{year}{output.suffix}")
+            print(f"Writing {year} rows to: {year_path}")
+            try:
+                write_csv(groups.get(year, df.iloc[:0]), year_path)
+            except Exception as e:
+                print(f"Failed to write output CSV: {e}", file=sys.stderr)
+                sys.exit(1)
+
+    print("Done.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Filter forest CSV to Year >= 1990, add Region, and optionally split by year.")
+    parser.add_argument("--input", "-i", default="FIT3179/data/forest-area-as-share-of-land-area.csv", help="Input CSV path")
+    parser.add_argument("--output", "-o", default="FIT3179/data/forest_area_with_region.csv", help="Output CSV path")
+    parser.add_argument("--mapping-url", "-m", default=MAPPING_CSV_URL, help="URL to country->continent mapping CSV")
+    parser.add_argument("--split-years", "-y", type=int, nargs="*", default=[], help="Also write one CSV per year")
+    args = parser.parse_args()
+    main(args.input, args.output, mapping_url=args.mapping_url, split_years=args.split_years)
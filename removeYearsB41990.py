@@ -1,30 +1,47 @@
-import csv
+import argparse
 
-input_file = "FIT3179/data/annual-co-emissions-by-region-percentage.csv"
-output_file = "FIT3179/data/regionalCo2Percentage.csv"
+import numpy as np
+import pandas as pd
 
-with open(input_file, "r", newline="", encoding="utf-8") as infile, \
-     open(output_file, "w", newline="", encoding="utf-8") as outfile:
+parser = argparse.ArgumentParser(description="Keep only rows with Year >= 1990.")
+parser.add_argument("--input", "-i", default="FIT3179/data/annual-co-emissions-by-region-percentage.csv", help="Input CSV path")
+# An output path ending in ".parquet" writes a Parquet file instead of CSV, for use as an
+# intermediate (e.g. as addRegion.py's input); final outputs read by the charts stay CSV.
+parser.add_argument("--output", "-o", default="FIT3179/data/regionalCo2Percentage.csv",
+                    help="Output path (.csv, or .parquet for an intermediate file)")
+args = parser.parse_args()
 
-    reader = csv.reader(infile)
-    writer = csv.writer(outfile)
+input_file = args.input
+output_file = args.output
+buffer_size = 1 << 20  # 1 MB output buffer instead of the 8 KB default
 
-    header = next(reader)
-    writer.writerow(header)
+# Values are kept as text so rows are written out exactly as read.
+# The input is memory-mapped, so the parser reads straight from the page cache
+# instead of copying it through read() calls.
+df = pd.read_csv(input_file, dtype=str, keep_default_na=False, memory_map=True, encoding="utf-8")
 
-    # Find the index of the "Year" column
-    try:
-        year_index = header.index("Year")
-    except ValueError:
-        raise Exception("No 'Year' column found in CSV header.")
+# Make sure there is a "Year" column
+if "Year" not in df.columns:
+    raise Exception("No 'Year' column found in CSV header.")
 
-    # Write only rows where Year >= 1990
-    for row in reader:
-        try:
-            if int(row[year_index]) >= 1990:
-                writer.writerow(row)
-        except ValueError:
-            # Skip rows where the year value isn't numeric
-            continue
+# Keep only rows where Year >= 1990
+# (non-numeric years become NaN and are dropped by the comparison).
+# The mask is computed on the contiguous numpy array and used as a plain boolean
+# array, so pandas doesn't have to build or align an index-backed Series for it.
+years = pd.to_numeric(df["Year"], errors="coerce").to_numpy(dtype=np.float64)
+kept = df[np.greater_equal(years, 1990)]
+if output_file.endswith(".parquet"):
+    # Store typed columns, as pd.read_csv would infer them, so the Parquet file is
+    # re-read without any parsing and gives the same frame as the CSV route:
+    # empty fields become missing, all-numeric columns become int64/float64.
+    typed = {}
+    for name, col in kept.items():
+        col = col.replace("", np.nan)
+        numbers = pd.to_numeric(col, errors="coerce")
+        typed[name] = numbers if numbers.notna().sum() == col.notna().sum() else col
+    pd.DataFrame(typed).to_parquet(output_file, compression="zstd", index=False)
+else:
+    with open(output_file, "w", newline="", encoding="utf-8", buffering=buffer_size) as outfile:
+        kept.to_csv(outfile, index=False)
 
 print(f"✅ Filtered data written to '{output_file}'")
@@ -4,23 +4,35 @@ import csv
 years = [1990, 2000, 2010, 2015]
 input_file = "Project 2/data/annual-deforestation.csv"
 output_files = {year: f"Project 2/data/deforestation{year}.csv" for year in years}
+batch_size = 10000  # rows buffered per year before one writerows call
 
-# Read the input CSV and split rows by year
+# Read the input CSV and split rows by year; rows are plain lists forwarded verbatim
 with open(input_file, newline='', encoding='utf-8') as infile:
-    reader = csv.DictReader(infile)
+    reader = csv.reader(infile)
+    header = next(reader)
+    # Find the Year column by position once, instead of a dict lookup per row
+    year_index = header.index('Year')
     # Prepare writers for each year
-    writers = {}
     outfiles = {}
+    writers = {}
     for year in years:
         outfiles[year] = open(output_files[year], 'w', newline='', encoding='utf-8')
-        writers[year] = csv.DictWriter(outfiles[year], fieldnames=reader.fieldnames)
-        writers[year].writeheader()
-    # Write rows to the appropriate file
+        writers[year] = csv.writer(outfiles[year])
+        writers[year].writerow(header)
+    # Write rows to the appropriate file: one dict lookup per row replaces both the
+    # membership test and the writer fetch; rows are flushed in batches with writerows
+    buffers = {year: [] for year in years}
     for row in reader:
-        year_val = int(row['Year'])
-        if year_val in years:
-            writers[year_val].writerow(row)
-    # Close all output files
+        year_val = int(row[year_index])
+        buffer = buffers.get(year_val)
+        if buffer is not None:
+            buffer.append(row)
+            if len(buffer) >= batch_size:
+                writers[year_val].writerows(buffer)
+                buffer.clear()
+    # Flush the remaining rows and close all output files
+    for year, buffer in buffers.items():
+        writers[year].writerows(buffer)
     for f in outfiles.values():
         f.close()
 